@@ -22,13 +22,6 @@ from ._mp_queue import ClientMPQueue, MPProtocol, MPQueue, ServerMPQueue
 from ._singleton import Singleton
 from ._socket_helper import CancelledError, SocketCancellationToken
 
-HAS_DEBUGPY = True
-try:  # pragma: nocover
-    import debugpy
-
-except Exception:  # pragma: nocover
-    HAS_DEBUGPY = False
-
 log = logging.getLogger(__name__)
 
 
@@ -224,7 +217,7 @@ class AnsibleDebugger(metaclass=Singleton):
         self._debug_config: DebugConfiguration = DebugConfiguration()
         self._proc_pid_file = get_pid_info_path(os.getpid())
         self._proto = DAProtocol(self)
-        self._send_queue: queue.Queue[dap.ProtocolMessage | None] = queue.Queue()
+        self._send_queue: queue.Queue[dap.ProtocolMessage | list[dap.ProtocolMessage] | None] = queue.Queue()
         self._send_thread: threading.Thread | None = None
         self._strategy_connected = threading.Condition()
         self._strategy: DebugState | None = None
@@ -237,6 +230,9 @@ class AnsibleDebugger(metaclass=Singleton):
         # Stores all the client breakpoints, key is the breakpoint number/id
         self._breakpoints: dict[int, AnsibleLineBreakpoint] = {}
         self._breakpoint_counter = 1
+        # The Ansible paths that have a breakpoint so get_breakpoint can skip
+        # the paths without one.
+        self._breakpoint_paths: frozenset[str] = frozenset()
 
         # Key is the path, the value is a list of the lines in that file where:
         #   None - Line is a continuation of a breakpoint range
@@ -290,6 +286,16 @@ class AnsibleDebugger(metaclass=Singleton):
                 self._strategy = None
                 self._strategy_connected.notify_all()
 
+    @property
+    def adapter_connected(self) -> bool:
+        """Whether a debug adapter is currently connected to the debuggee."""
+        return self._adapter_connected
+
+    @property
+    def has_breakpoints(self) -> bool:
+        """Whether the debug adapter has set any breakpoints."""
+        return bool(self._breakpoints)
+
     def next_thread_id(self) -> int:
         tid = self._thread_counter
         self._thread_counter += 1
@@ -342,6 +348,9 @@ class AnsibleDebugger(metaclass=Singleton):
             Optional[AnsibleLineBreakpoint]: The breakpoint associated with the
             args if present.
         """
+        if path not in self._breakpoint_paths:
+            return None
+
         for b in self._breakpoints.values():
             if (
                 b.actual_path == path
@@ -448,6 +457,7 @@ class AnsibleDebugger(metaclass=Singleton):
         # breakpoints and our debug config no longer applies
         self._debug_config = DebugConfiguration()
         self._breakpoints = {}
+        self._breakpoint_paths = frozenset()
 
         # Ensure the callback plugin isn't stuck waiting for this
         self._configuration_done.set()
@@ -481,6 +491,23 @@ class AnsibleDebugger(metaclass=Singleton):
         """
         self._send_queue.put(msg)
 
+    def queue_msgs(
+        self,
+        msgs: collections.abc.Iterable[dap.ProtocolMessage],
+    ) -> None:
+        """Queues multiple messages to send to the debug adapter.
+
+        Adds the messages to the send queue as a single entry. The send thread
+        will write them to the debug adapter together rather than one socket
+        write per message.
+
+        Args:
+            msgs: The messages to send.
+        """
+        msg_list = list(msgs)
+        if msg_list:
+            self._send_queue.put(msg_list)
+
     def convert_to_client_path(
         self,
         path: str,
@@ -522,15 +549,40 @@ class AnsibleDebugger(metaclass=Singleton):
             bp_type: Set to 1 for a valid breakpoint and 0 for an invalid
                 breakpoint section.
         """
-        # Ensure each new entry has a starting value of 0 which denotes that
-        # a breakpoint cannot be set at the start of the file. It can only be
-        # set when a line was registered.
-        file_lines = self._source_info.setdefault(path, [0])
-        file_lines.extend([None] * (1 + line - len(file_lines)))
-        file_lines[line] = bp_type
+        self.register_path_breakpoints([(path, line, bp_type)])
+
+    def register_path_breakpoints(
+        self,
+        entries: collections.abc.Iterable[tuple[str, int, int]],
+    ) -> None:
+        """Register multiple valid breakpoint sections.
+
+        Like register_path_breakpoint but registers all the entries before
+        recalculating the client breakpoints for the affected paths. This is
+        used when registering a whole file worth of tasks so the breakpoints
+        are only checked once rather than for every task entry.
 
+        Args:
+            entries: A tuple of the path, line, and bp_type to register. See
+                register_path_breakpoint for more information.
+        """
+        changed_paths: dict[str, list[int | None]] = {}
+        for path, line, bp_type in entries:
+            # Ensure each new entry has a starting value of 0 which denotes
+            # that a breakpoint cannot be set at the start of the file. It can
+            # only be set when a line was registered.
+            file_lines = changed_paths.get(path)
+            if file_lines is None:
+                file_lines = changed_paths[path] = self._source_info.setdefault(path, [0])
+
+            file_lines.extend([None] * (1 + line - len(file_lines)))
+            file_lines[line] = bp_type
+
+        # The changed breakpoints are sent together in one write.
+        bp_events: list[dap.BreakpointEvent] = []
         for breakpoint in self._breakpoints.values():
-            if breakpoint.actual_path != path:
+            file_lines = changed_paths.get(breakpoint.actual_path)
+            if file_lines is None:
                 continue
 
             source_breakpoint = breakpoint.source_breakpoint
@@ -547,20 +599,26 @@ class AnsibleDebugger(metaclass=Singleton):
                 or breakpoint.breakpoint.end_line != bp.end_line
             ):
                 breakpoint.breakpoint = bp
-                self.queue_msg(
+                bp_events.append(
                     dap.BreakpointEvent(
                         reason="changed",
                         breakpoint=bp,
                     )
                 )
 
+        self.queue_msgs(bp_events)
+
     @classmethod
     def _enable_debugpy(cls) -> None:  # pragma: nocover
         """This is only meant for debugging ansibug in Ansible purposes."""
-        if not HAS_DEBUGPY:
-            raise Exception("Failed to enable debugging because debugpy is not installed")
+        # Imported here so normal runs don't pay the cost of importing debugpy
+        # and pydevd when it happens to be installed.
+        try:
+            import debugpy
+        except Exception as e:
+            raise Exception("Failed to enable debugging because debugpy is not installed") from e
 
-        elif not debugpy.is_client_connected():
+        if not debugpy.is_client_connected():
             debugpy.listen(("localhost", 12535))
             debugpy.wait_for_client()
 
@@ -696,6 +754,8 @@ class AnsibleDebugger(metaclass=Singleton):
             )
             breakpoint_info.append(bp)
 
+        self._breakpoint_paths = frozenset(b.actual_path for b in self._breakpoints.values())
+
         resp = dap.SetBreakpointsResponse(
             request_seq=msg.seq,
             breakpoints=breakpoint_info,
@@ -826,6 +886,7 @@ class AnsibleDebugger(metaclass=Singleton):
     ) -> None:
         self._debug_config = DebugConfiguration()
         self._breakpoints = {}
+        self._breakpoint_paths = frozenset()
 
         strategy = self._get_strategy()
         strategy.disconnect(msg)
@@ -852,7 +913,10 @@ class AnsibleDebugger(metaclass=Singleton):
 
             while msg := self._send_queue.get():
                 log.info("Sending to debug adapter %r", msg)
-                mp_queue.send(msg)
+                if isinstance(msg, list):
+                    mp_queue.send_many(msg)
+                else:
+                    mp_queue.send(msg)
 
         except CancelledError:
             pass
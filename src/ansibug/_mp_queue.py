@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import collections.abc
 import logging
 import pathlib
 import pickle
@@ -76,9 +77,20 @@ class MPQueue:
         self,
         data: ProtocolMessage,
     ) -> None:
-        b_data = pickle.dumps(data)
-        b_len = len(b_data).to_bytes(4, byteorder="little")
-        self._socket.send(b_len + b_data, self._cancel_token)
+        self.send_many([data])
+
+    def send_many(
+        self,
+        data: collections.abc.Iterable[ProtocolMessage],
+    ) -> None:
+        """Sends multiple messages in a single socket write."""
+        b_frames = []
+        for msg in data:
+            b_msg = pickle.dumps(msg)
+            b_frames.append(len(b_msg).to_bytes(4, byteorder="little"))
+            b_frames.append(b_msg)
+
+        self._socket.send(b"".join(b_frames), self._cancel_token)
 
     def start(
         self,
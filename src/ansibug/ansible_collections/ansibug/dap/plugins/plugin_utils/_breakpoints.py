@@ -3,6 +3,8 @@
 
 from __future__ import annotations
 
+import itertools
+
 from ansible.playbook.block import Block
 from ansible.playbook.play import Play
 from ansible.playbook.task import Task
@@ -11,8 +13,8 @@ from ansibug._debuggee import AnsibleDebugger
 
 
 def _split_task_path(task_path: str) -> tuple[str, int]:
-    split = task_path.rsplit(":", 1)
-    return split[0], int(split[1])
+    path, _, line = task_path.rpartition(":")
+    return path, int(line)
 
 
 def register_block_breakpoints(
@@ -29,34 +31,9 @@ def register_block_breakpoints(
         debugger: The AnsibleDebugger object to register the breakpoints on.
         blocks: The blocks to scan for breakpoints.
     """
-    # Need to register these blocks as valid breakpoints and update the client bps
-    for block in blocks:
-        block_path_and_line = block.get_path()
-        if block_path_and_line:
-            # If the path is set this is an explicit block and should be
-            # marked as an invalid breakpoint section.
-            block_path, block_line = _split_task_path(block_path_and_line)
-            debugger.register_path_breakpoint(block_path, block_line, 0)
-
-        task_list: list[Task] = block.block[:]
-        task_list.extend(block.rescue)
-        task_list.extend(block.always)
-
-        for task in task_list:
-            if isinstance(task, Block):
-                # import_tasks will wrap the tasks in a standalone block.
-                register_block_breakpoints(debugger, [task])
-
-            else:
-                # 2.19 changed how the play's flush_handlers and implicit
-                # no-op tasks are setup. It no longer has the loader path and
-                # play details so skip registering these if not set.
-                raw_task_path = task.get_path()
-                if not raw_task_path:
-                    continue
-
-                task_path, task_line = _split_task_path(raw_task_path)
-                debugger.register_path_breakpoint(task_path, task_line, 1)
+    entries: list[tuple[str, int, int]] = []
+    _get_block_breakpoints(blocks, entries)
+    debugger.register_path_breakpoints(entries)
 
 
 def register_play_breakpoints(
@@ -73,14 +50,47 @@ def register_play_breakpoints(
         debugger: The AnsibleDebugger object to register the breakpoints on.
         plays: The plays to scan for breakpoints.
     """
+    entries: list[tuple[str, int, int]] = []
     for play in plays:
         # This is essentially doing what play.compile() does but without the
         # flush stages.
         play_path, play_line = _split_task_path(play.get_path())
-        debugger.register_path_breakpoint(play_path, play_line, 1)
+        entries.append((play_path, play_line, 1))
 
         play_blocks = play.compile() + play.handlers
         for r in play.roles:
             play_blocks += r.get_handler_blocks(play)
 
-        register_block_breakpoints(debugger, play_blocks)
+        _get_block_breakpoints(play_blocks, entries)
+
+    debugger.register_path_breakpoints(entries)
+
+
+def _get_block_breakpoints(
+    blocks: list[Block],
+    entries: list[tuple[str, int, int]],
+) -> None:
+    for block in blocks:
+        block_path_and_line = block.get_path()
+        if block_path_and_line:
+            # If the path is set this is an explicit block and should be
+            # marked as an invalid breakpoint section.
+            block_path, block_line = _split_task_path(block_path_and_line)
+            entries.append((block_path, block_line, 0))
+
+        task: Task | Block
+        for task in itertools.chain(block.block, block.rescue, block.always):
+            if isinstance(task, Block):
+                # import_tasks will wrap the tasks in a standalone block.
+                _get_block_breakpoints([task], entries)
+
+            else:
+                # 2.19 changed how the play's flush_handlers and implicit
+                # no-op tasks are setup. It no longer has the loader path and
+                # play details so skip registering these if not set.
+                raw_task_path = task.get_path()
+                if not raw_task_path:
+                    continue
+
+                task_path, task_line = _split_task_path(raw_task_path)
+                entries.append((task_path, task_line, 1))
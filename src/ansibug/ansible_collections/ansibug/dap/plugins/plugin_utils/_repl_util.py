@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import argparse
 import dataclasses
+import functools
 import shlex
 import typing as t
 from typing import IO
@@ -42,6 +43,9 @@ class SetVarCommand(ReplCommand):
     expression: str
 
 
+# The result is an immutable ReplCommand or str so can be cached, this avoids
+# rebuilding the argparse parser for a command that is repeated.
+@functools.lru_cache(maxsize=256)
 def parse_repl_args(
     args: str,
 ) -> ReplCommand | str:
@@ -13,17 +13,23 @@ description:
 author: Jordan Borean (@jborean93)
 """
 
+import ast
+import collections
 import collections.abc
 import enum
+import functools
 import inspect
+import itertools
 import logging
 import os
+import re
 import threading
 import traceback
 import typing as t
+import weakref
 
 from ansible import constants as C
-from ansible.errors import AnsibleError, AnsibleUndefinedVariable
+from ansible.errors import AnsibleError
 from ansible.executor.play_iterator import PlayIterator
 from ansible.executor.task_queue_manager import TaskQueueManager
 from ansible.executor.task_result import TaskResult
@@ -38,6 +44,7 @@ from ansible.plugins.strategy.linear import StrategyModule as LinearStrategy
 from ansible.template import AnsibleNativeEnvironment, Templar
 from ansible.utils.display import Display
 from ansible.vars.manager import VariableManager
+from jinja2 import Environment, Template, nodes
 
 import ansibug
 from ansibug._debuggee import (
@@ -58,6 +65,152 @@ from ..plugin_utils._repl_util import (
 display = Display()
 log = logging.getLogger("ansibug.strategy")
 
+# The ansible constants are tuples, use sets for the membership checks done
+# per task.
+_INCLUDE_ACTIONS = frozenset(C._ACTION_ALL_INCLUDES)
+_INCLUDE_ROLE_ACTIONS = frozenset(C._ACTION_INCLUDE_ROLE)
+_EVAL_CONTEXTS = frozenset(["repl", "watch", "clipboard", "variables"])
+# Contexts where the client copies the value so it should not be truncated.
+_COPY_CONTEXTS = frozenset(["clipboard", "variables"])
+
+# Exact types used to avoid the slower ABC isinstance checks for most values.
+_CONTAINER_TYPES = frozenset([dict, list, tuple])
+_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+# The ABC check result for other types, like AnsibleUnicode or AnsibleMapping.
+_IS_CONTAINER_CACHE: dict[type, bool] = {}
+# Scalars that template to themselves, str is excluded as it may be a template.
+_LITERAL_TYPES = frozenset([int, float, bool, type(None)])
+# Python literals that Jinja parses to the same value. None is excluded as
+# Jinja renders it as an empty string and floats are checked with
+# _FLOAT_LITERAL_PATTERN as Jinja does not accept forms like `1.` or `.5`.
+_LITERAL_EVAL_TYPES = frozenset([int, bool])
+_FLOAT_LITERAL_PATTERN = re.compile(r"[+-]?\d[\d_]*(\.\d[\d_]*)?([eE][+-]?\d+)?")
+# Names that Jinja treats as a literal rather than a variable lookup.
+_JINJA_LITERAL_NAMES = frozenset(["true", "false", "none", "True", "False", "None"])
+
+
+def _is_container(value: t.Any) -> bool:
+    """Checks if the value can be expanded as a child variable."""
+    value_type = type(value)
+    if value_type in _CONTAINER_TYPES:
+        return True
+    elif value_type in _SCALAR_TYPES:
+        return False
+
+    is_container = _IS_CONTAINER_CACHE.get(value_type, None)
+    if is_container is None:
+        is_container = isinstance(value, (collections.abc.Mapping, collections.abc.Sequence)) and not isinstance(
+            value, (str, bytes, bytearray)
+        )
+        _IS_CONTAINER_CACHE[value_type] = is_container
+
+    return is_container
+
+
+# Limits on the variable value sent to the client, the client only displays
+# a single line so there is no need to serialize large values in full.
+_MAX_REPR_ITEMS = 100
+_MAX_REPR_LENGTH = 200
+
+
+def _short_repr(value: t.Any) -> str:
+    """Gets a repr of a variable value shortened for display by the client.
+
+    Only containers are shortened as the client can expand them or copy them
+    through the variable's evaluate name. Large containers are summarised by
+    their length. Other containers are built like repr but stop reading
+    entries once _MAX_REPR_LENGTH characters have been written. This avoids
+    reading every value of lazy mappings like hostvars just to throw the
+    result away. Values that fit are the same as repr.
+
+    A shortened container is never valid Jinja so editing the displayed value
+    fails rather than setting the shortened value.
+    """
+    if not _is_container(value):
+        return repr(value)
+
+    elif len(value) > _MAX_REPR_ITEMS:
+        return f"{type(value).__name__} (len={len(value)})"
+
+    parts: list[str] = []
+    _write_short_repr(value, parts, _MAX_REPR_LENGTH)
+    return "".join(parts)
+
+
+def _write_short_repr(
+    value: t.Any,
+    parts: list[str],
+    remaining: int,
+) -> int:
+    """Writes the repr of value to parts and returns the remaining length."""
+    if not _is_container(value):
+        if isinstance(value, str) and len(value) > remaining:
+            value_repr = f"{value[: max(remaining, 0)]!r}..."
+        else:
+            value_repr = repr(value)
+            if len(value_repr) > remaining:
+                value_repr = f"{value_repr[: max(remaining, 0)]}..."
+
+        parts.append(value_repr)
+        return remaining - len(value_repr)
+
+    is_mapping = isinstance(value, collections.abc.Mapping)
+    if is_mapping:
+        start, end = "{", "}"
+    elif isinstance(value, tuple):
+        start, end = "(", ",)" if len(value) == 1 else ")"
+    else:
+        start, end = "[", "]"
+
+    parts.append(start)
+    remaining -= len(start)
+
+    for idx, entry in enumerate(value.items() if is_mapping else value):
+        if idx:
+            parts.append(", ")
+            remaining -= 2
+
+        if remaining <= 0:
+            parts.append("...")
+            break
+
+        if is_mapping:
+            remaining = _write_short_repr(entry[0], parts, remaining)
+            parts.append(": ")
+            remaining = _write_short_repr(entry[1], parts, remaining - 2)
+        else:
+            remaining = _write_short_repr(entry, parts, remaining)
+
+    parts.append(end)
+    return remaining - len(end)
+
+
+# Limit of compiled client expressions kept by _cache_compiled_templates.
+_TEMPLATE_CACHE_SIZE = 512
+
+
+def _cache_compiled_templates(environment: Environment) -> None:
+    """Caches the templates the environment compiles from a string.
+
+    The Templar compiles the source on every call, this lets the expressions
+    evaluated repeatedly by the client, like watch expressions, skip the parse
+    and compile step and only render the template.
+    """
+    from_string = environment.from_string
+    compile_source = functools.lru_cache(maxsize=_TEMPLATE_CACHE_SIZE)(from_string)
+
+    def cached_from_string(
+        source: str | nodes.Template,
+        globals: collections.abc.MutableMapping[str, t.Any] | None = None,
+        template_class: type[Template] | None = None,
+    ) -> Template:
+        if isinstance(source, str) and globals is None and template_class is None:
+            return compile_source(source)
+
+        return from_string(source, globals=globals, template_class=template_class)
+
+    environment.from_string = cached_from_string  # type: ignore[method-assign]
+
 
 class ThreadState(enum.Enum):
     CONTINUE = enum.auto()
@@ -80,6 +233,13 @@ class ThreadState(enum.Enum):
 
 
 class AnsibleThread:
+    __slots__ = ("id", "host", "stack_frames", "state", "_stopped_task")
+
+    # The parent of a task doesn't change once loaded, cache the lookups done
+    # by the step actions as they can walk multiple blocks. Shared across all
+    # threads as they all run the same tasks.
+    _parent_task_cache: weakref.WeakKeyDictionary[Task, Task | None] = weakref.WeakKeyDictionary()
+
     def __init__(
         self,
         *,
@@ -88,7 +248,7 @@ class AnsibleThread:
     ) -> None:
         self.id = id
         self.host = host
-        self.stack_frames: list[int] = []
+        self.stack_frames: collections.deque[int] = collections.deque()
         self.state: ThreadState = ThreadState.CONTINUE
         self._stopped_task: Task | None = None
 
@@ -110,16 +270,12 @@ class AnsibleThread:
             # task.
             task = self._stopped_task
             while task := task._parent:
-                if isinstance(task, Task) and task.action in C._ACTION_ALL_INCLUDES:
+                if isinstance(task, Task) and task.action in _INCLUDE_ACTIONS:
                     break
 
             self._stopped_task = task
 
-        elif (
-            state == ThreadState.STEP_IN
-            and self._stopped_task
-            and self._stopped_task.action not in C._ACTION_ALL_INCLUDES
-        ):
+        elif state == ThreadState.STEP_IN and self._stopped_task and self._stopped_task.action not in _INCLUDE_ACTIONS:
             # If changing to STEP_IN but the stopped task was not an include,
             # treat it like STEP_OVER.
             state = ThreadState.STEP_OVER
@@ -209,14 +365,40 @@ class AnsibleThread:
         self,
         task: Task,
     ) -> Task | None:
-        while task := task._parent:
-            if isinstance(task, Task):
-                return task
+        try:
+            return self._parent_task_cache[task]
+        except KeyError:
+            pass
 
-        return None
+        parent: Task | None = None
+        current = task
+        while current := current._parent:
+            if isinstance(current, Task):
+                parent = current
+                break
+
+        self._parent_task_cache[task] = parent
+        return parent
 
 
 class AnsibleStackFrame:
+    __slots__ = (
+        "id",
+        "task",
+        "task_vars",
+        "scopes",
+        "variables",
+        "variables_options_id",
+        "variables_taskvar_id",
+        "variables_hostvars_id",
+        "path",
+        "line",
+        "task_args",
+        "_debugger",
+        "_host_vars",
+        "_host_vars_source",
+    )
+
     def __init__(
         self,
         *,
@@ -229,33 +411,83 @@ class AnsibleStackFrame:
         self.task = task
         self.task_vars = task_vars
         self.scopes: list[int] = []
-        self.variables: list[int] = []
+        self.variables: set[int] = set()
         self.variables_options_id = 0
         self.variables_taskvar_id = 0
         self.variables_hostvars_id = 0
 
+        # Some implicit meta tasks are added without a loader so won't have
+        # a path, these are left as an empty path and line 0.
+        path, _, line = task.get_path().rpartition(":")
+        self.path = path
+        self.line = int(line) if path else 0
+
+        # The templated task args, see AnsibleDebugState.get_scopes.
+        self.task_args: dict[str, t.Any] | None = None
+
         self._debugger = debugger
+        self._host_vars: dict[str, t.Any] | None = None
+        self._host_vars_source: collections.abc.Mapping[str, t.Any] | None = None
 
-    def to_dap(self) -> ansibug.dap.StackFrame:
-        task_path = self.task.get_path()
+    @property
+    def _hostvars_entry(self) -> collections.abc.Mapping[str, t.Any]:
+        """The hostvars entry of the frame's host.
+
+        Each lookup of a host in hostvars calls VariableManager.get_vars so
+        the entry is only looked up once for the lifetime of the frame.
+        """
+        if self._host_vars_source is None:
+            self._host_vars_source = self.task_vars["hostvars"][self.task_vars["inventory_hostname"]]
+
+        return self._host_vars_source
+
+    @property
+    def host_vars(self) -> dict[str, t.Any]:
+        """The host vars of the frame overlayed with the task vars.
+
+        The hostvars are read on the first access and reused for the lifetime
+        of the frame as reading them will template each value.
+        """
+        if self._host_vars is None:
+            # We use the hostvars but for simplicity sake we also overlay the
+            # task vars that might be set as these will contain things like
+            # play/task vars. The hostvars are a more persistent set of vars
+            # that last beyond this task so is important to give the user a
+            # way to set these persistently in the debugger.
+            host_vars = dict(self._hostvars_entry)
+            host_vars.update({k: v for k, v in self.task_vars.items() if k not in host_vars})
+
+            self._host_vars = host_vars
+
+        return self._host_vars
+
+    @property
+    def host_vars_count(self) -> int:
+        """The number of host vars without reading the hostvars values."""
+        if self._host_vars is not None:
+            return len(self._host_vars)
 
-        task_path_and_line = task_path.rsplit(":", 1)
-        path = task_path_and_line[0]
-        line = int(task_path_and_line[1])
-        client_path = self._debugger.convert_to_client_path(path)
+        return len(self.task_vars.keys() | self._hostvars_entry.keys())
+
+    def to_dap(self) -> ansibug.dap.StackFrame:
+        # The client path is not cached as the path mappings can change when
+        # a new client attaches.
+        client_path = self._debugger.convert_to_client_path(self.path)
         source = ansibug.dap.Source(name=os.path.basename(client_path), path=client_path)
 
         return ansibug.dap.StackFrame(
             id=self.id,
             name=self.task.get_name(),
             source=source,
-            line=line,
+            line=self.line,
         )
 
 
 class AnsibleVariable:
     """Structure needed for an AnsibleVariable implementation."""
 
+    __slots__ = ("id", "stackframe", "children", "evaluate_name")
+
     def __init__(
         self,
         id: int,
@@ -263,6 +495,13 @@ class AnsibleVariable:
     ) -> None:
         self.id = id
         self.stackframe = stackframe
+        # Child container variables by name along with the value they wrap so
+        # repeated requests reuse the same variable id.
+        self.children: dict[str, tuple[t.Any, AnsibleVariable]] = {}
+        # The expression the client can evaluate to get the full value, an
+        # empty string is a scope whose children are variable names and None
+        # is a value that cannot be evaluated, like the module options.
+        self.evaluate_name: str | None = None
 
     @property
     def named_variables(self) -> int:
@@ -272,9 +511,34 @@ class AnsibleVariable:
     def indexed_variables(self) -> int:
         return 0
 
+    def child_evaluate_name(
+        self,
+        name: str,
+    ) -> str | None:
+        """Gets the expression the client can evaluate for a child value."""
+        if self.evaluate_name is None:
+            return None
+
+        elif self.evaluate_name:
+            return f"{self.evaluate_name}[{name!r}]"
+
+        elif name.isidentifier() and name not in _JINJA_LITERAL_NAMES:
+            return name
+
+        else:
+            return f"vars[{name!r}]"
+
     def get(self) -> collections.abc.Iterable[tuple[str, t.Any]]:
         raise NotImplementedError()  # pragma: nocover
 
+    def get_slice(
+        self,
+        start: int,
+        count: int,
+    ) -> collections.abc.Iterable[tuple[str, t.Any]]:
+        """Gets the child variables from start up to count entries or all if 0."""
+        return itertools.islice(self.get(), start, start + count if count else None)
+
     def remove(
         self,
         index: str,
@@ -292,6 +556,8 @@ class AnsibleVariable:
 class AnsibleListVariable(AnsibleVariable):
     """AnsibleVariable with a list datastore."""
 
+    __slots__ = ("_ds",)
+
     def __init__(
         self,
         id: int,
@@ -305,9 +571,23 @@ class AnsibleListVariable(AnsibleVariable):
     def indexed_variables(self) -> int:
         return len(self._ds)
 
+    def child_evaluate_name(
+        self,
+        name: str,
+    ) -> str | None:
+        return f"{self.evaluate_name}[{name}]" if self.evaluate_name else None
+
     def get(self) -> collections.abc.Iterable[tuple[str, t.Any]]:
         return iter((str(k), v) for k, v in enumerate(self._ds))
 
+    def get_slice(
+        self,
+        start: int,
+        count: int,
+    ) -> collections.abc.Iterable[tuple[str, t.Any]]:
+        end = start + count if count else len(self._ds)
+        return iter((str(i), self._ds[i]) for i in range(start, min(end, len(self._ds))))
+
     def set(
         self,
         index: str,
@@ -319,6 +599,8 @@ class AnsibleListVariable(AnsibleVariable):
 class AnsibleDictVariable(AnsibleVariable):
     """AnsibleVariable with a dict datastore."""
 
+    __slots__ = ("_ds",)
+
     def __init__(
         self,
         id: int,
@@ -353,6 +635,8 @@ class AnsibleDictVariable(AnsibleVariable):
 class AnsibleDictWithRawStoreVariable(AnsibleDictVariable):
     """AnsibleDictVariable with a secondary/raw datastore to replicate changes to."""
 
+    __slots__ = ("_raw_ds",)
+
     def __init__(
         self,
         id: int,
@@ -373,26 +657,59 @@ class AnsibleDictWithRawStoreVariable(AnsibleDictVariable):
 
 
 class AnsibleHostVarsVariable(AnsibleDictVariable):
-    """AnsibleDictVariable with integration into a host variable manager."""
+    """AnsibleDictVariable with integration into a host variable manager.
+
+    The datastore is the host vars of the stack frame which are only read when
+    first accessed.
+    """
+
+    __slots__ = ("_host", "_variable_manager")
 
     def __init__(
         self,
         id: int,
         stackframe: AnsibleStackFrame,
-        value: collections.abc.Mapping[t.Any, t.Any],
         host: str,
         variable_manager: VariableManager,
     ) -> None:
-        super().__init__(id, stackframe, value)
+        AnsibleVariable.__init__(self, id, stackframe)
         self._host = host
         self._variable_manager = variable_manager
 
+    @property
+    def _ds(self) -> dict[t.Any, t.Any]:  # type: ignore[override]
+        return self.stackframe.host_vars
+
+    @property
+    def named_variables(self) -> int:
+        return self.stackframe.host_vars_count
+
+    def child_evaluate_name(
+        self,
+        name: str,
+    ) -> str | None:
+        # The hostvars take priority over the task vars overlayed on them.
+        if name in self.stackframe._hostvars_entry:
+            return f"hostvars[inventory_hostname][{name!r}]"
+
+        return super().child_evaluate_name(name)
+
     def set(self, index: str, value: t.Any) -> None:
         super().set(index, value)
         # Persisting hostvars need to be done as a host_variable.
         self._variable_manager.set_host_variable(self._host, index, value)
 
 
+def _child_variable_type(
+    value: collections.abc.Mapping[t.Any, t.Any] | collections.abc.Sequence[t.Any],
+) -> type[AnsibleDictVariable] | type[AnsibleListVariable]:
+    """Gets the AnsibleVariable type used for a child container value."""
+    if isinstance(value, collections.abc.Mapping):
+        return AnsibleDictVariable
+    else:
+        return AnsibleListVariable
+
+
 class AnsibleDebugState(DebugState):
     """Ansible Debug State.
 
@@ -420,10 +737,32 @@ class AnsibleDebugState(DebugState):
         self.stackframes: dict[int, AnsibleStackFrame] = {}
         self.variables: dict[int, AnsibleVariable] = {}
 
+        # Index of the host threads to avoid scanning self.threads per task.
+        self._threads_by_host: dict[Host, AnsibleThread] = {}
         self._debugger = debugger
         self._loader = loader
-        self._variable_mamanger = variable_manager
+        self._variable_manager = variable_manager
         self._waiting_condition = threading.Condition()
+        # Breakpoint ids are not reused when the client updates a breakpoint
+        # so the conditional for an id can be kept for the whole run.
+        self._breakpoint_conditionals: dict[int, Conditional] = {}
+        # Only used by the strategy thread in start_task to evaluate the
+        # breakpoint conditions. The compiled conditions are cached so a
+        # breakpoint hit in a loop only renders the condition.
+        self._conditional_templar = Templar(loader=loader)
+        _cache_compiled_templates(self._conditional_templar.environment)
+        # The roles included by include_role that have had their blocks
+        # registered as breakpoints, each host will enter the same role.
+        self._role_blocks_seen: set[int] = set()
+
+        # Client expressions are templated with native types. The Templar is
+        # only used by the debug server thread so is created once for the
+        # compiled templates to be reused across requests.
+        native_templar = Templar(loader=loader)
+        if not C.DEFAULT_JINJA2_NATIVE:
+            native_templar = native_templar.copy_with_new_env(environment_class=AnsibleNativeEnvironment)
+        _cache_compiled_templates(native_templar.environment)
+        self._native_templar = native_templar
 
     def start_task(
         self,
@@ -442,10 +781,7 @@ class AnsibleDebugState(DebugState):
             task: The task to process.
             task_vars: The task variables.
         """
-        thread: AnsibleThread | None = next(
-            iter([t for t in self.threads.values() if t.host == host]),
-            None,
-        )
+        thread = self._threads_by_host.get(host, None)
         if not thread:
             thread = self._add_thread(host)
 
@@ -455,23 +791,23 @@ class AnsibleDebugState(DebugState):
             last_frame_id = thread.stack_frames[0]
             last_frame = self.stackframes[last_frame_id]
             if not parent_task or (last_frame.task and last_frame.task._uuid != parent_task._uuid):
-                thread.stack_frames.pop(0)
+                thread.stack_frames.popleft()
                 self.stackframes.pop(last_frame_id)
-                for variable_id in last_frame.variables:
-                    del self.variables[variable_id]
+                self._remove_variables(last_frame.variables)
 
             # If this is the first task in a role included by include_role we
-            # need to scan the tasks and handlers to validate the breakpoints
+            # need to scan the tasks and handlers to validate the breakpoints.
+            # This only needs to be done once per role for the play.
             if (
                 parent_task
                 and last_frame.task
-                and last_frame.task.action in C._ACTION_INCLUDE_ROLE
+                and last_frame.task.action in _INCLUDE_ROLE_ACTIONS
                 and hasattr(task, "_role")
+                and id(task._role) not in self._role_blocks_seen
             ):
-                task_handlers = task._role.get_task_blocks()
-                role_handlers = task._role.get_handler_blocks(task.play)
-                register_block_breakpoints(self._debugger, task_handlers)
-                register_block_breakpoints(self._debugger, role_handlers)
+                self._role_blocks_seen.add(id(task._role))
+                role_blocks = task._role.get_task_blocks() + task._role.get_handler_blocks(task.play)
+                register_block_breakpoints(self._debugger, role_blocks)
 
         sfid = self._debugger.next_stackframe_id()
 
@@ -481,34 +817,49 @@ class AnsibleDebugState(DebugState):
             task_vars=task_vars,
             debugger=self._debugger,
         )
-        thread.stack_frames.insert(0, sfid)
+        thread.stack_frames.appendleft(sfid)
 
-        # Some implicit meta tasks are added without a loader so won't have
-        # a path. We can't set breakpoints on these tasks so skip the check.
-        task_path = task.get_path()
-        if not task_path:
+        # Breakpoints and step requests can only come from a connected client,
+        # without one there is nothing that could stop this task. The stack
+        # frames are still tracked above in case a client attaches later.
+        if not self._debugger.adapter_connected:
             return
 
-        path_and_line = task_path.rsplit(":", 1)
-        path = path_and_line[0]
-        line = int(path_and_line[1])
+        # A continuing thread can only be stopped by a breakpoint, skip the
+        # lookup when the client has not set any.
+        if thread.state == ThreadState.CONTINUE and not self._debugger.has_breakpoints:
+            return
 
-        templar = Templar(loader=self._loader, variables=sf.task_vars)
+        # Tasks without a path can't have breakpoints so skip the check.
+        path = sf.path
+        if not path:
+            return
 
-        with self._waiting_condition:
-            tid = thread.id
+        line = sf.line
 
-            line_breakpoint = self._debugger.get_breakpoint(path, line)
-            if line_breakpoint and line_breakpoint.source_breakpoint.condition:
-                cond = Conditional(loader=self._loader)
+        line_breakpoint = self._debugger.get_breakpoint(path, line)
+        if line_breakpoint and line_breakpoint.source_breakpoint.condition:
+            templar = self._conditional_templar
+            templar.available_variables = sf.task_vars
+            cond = self._breakpoint_conditionals.get(line_breakpoint.id, None)
+            if cond is None:
+                cond = self._breakpoint_conditionals[line_breakpoint.id] = Conditional(loader=self._loader)
                 cond.when = [line_breakpoint.source_breakpoint.condition]
 
-                try:
-                    if not cond.evaluate_conditional(templar, templar.available_variables):
-                        line_breakpoint = None
-                except AnsibleError:
-                    # Treat a broken template as a false condition result.
+            try:
+                if not cond.evaluate_conditional(templar, templar.available_variables):
                     line_breakpoint = None
+            except AnsibleError:
+                # Treat a broken template as a false condition result.
+                line_breakpoint = None
+
+        # A continuing thread only stops on a breakpoint, skip the lock for
+        # the common case of running through a task without one.
+        if not line_breakpoint and thread.state == ThreadState.CONTINUE:
+            return
+
+        with self._waiting_condition:
+            tid = thread.id
 
             stopped_event = thread.should_break(task, line_breakpoint)
 
@@ -535,13 +886,12 @@ class AnsibleDebugState(DebugState):
             host: The inventory host for the task.
             task: The task to process.
         """
-        thread = next(iter([t for t in self.threads.values() if t.host == host]))
+        thread = self._threads_by_host[host]
 
-        if task.action not in C._ACTION_ALL_INCLUDES:
-            sfid = thread.stack_frames.pop(0)
+        if task.action not in _INCLUDE_ACTIONS:
+            sfid = thread.stack_frames.popleft()
             sf = self.stackframes.pop(sfid)
-            for variable_id in sf.variables:
-                del self.variables[variable_id]
+            self._remove_variables(sf.variables)
 
     def exit_threads(self) -> None:
         """Exits all active threads.
@@ -550,17 +900,21 @@ class AnsibleDebugState(DebugState):
         adapter. This is used by the strategy plugin when the inventory has
         been refreshed or the strategy is complete.
         """
-        for tid in list(self.threads.keys()):
-            if tid == 1:
-                continue
-
+        # The main thread is never exited, snapshot the remaining ids as the
+        # dict is mutated below.
+        thread_events: list[ansibug.dap.ThreadEvent] = []
+        for tid in tuple(tid for tid in self.threads if tid != 1):
             del self.threads[tid]
-            self._debugger.queue_msg(
+            thread_events.append(
                 ansibug.dap.ThreadEvent(
                     reason="exited",
                     thread_id=tid,
                 )
             )
+        self._threads_by_host.clear()
+        self._role_blocks_seen.clear()
+
+        self._debugger.queue_msgs(thread_events)
 
     def continue_request(
         self,
@@ -570,7 +924,7 @@ class AnsibleDebugState(DebugState):
             self._resume_threads([request.thread_id], ThreadState.CONTINUE)
             all_threads_continued = False
         else:
-            self._resume_threads(self.threads.keys(), ThreadState.CONTINUE)
+            self._resume_threads(list(self.threads), ThreadState.CONTINUE)
             all_threads_continued = True
 
         return ansibug.dap.ContinueResponse(
@@ -583,7 +937,7 @@ class AnsibleDebugState(DebugState):
         request: ansibug.dap.DisconnectRequest,
     ) -> None:
         state = ThreadState.END if request.terminate_debuggee else ThreadState.CONTINUE
-        self._resume_threads(list(self.threads.keys()), state)
+        self._resume_threads(list(self.threads), state)
 
     def get_scopes(
         self,
@@ -592,8 +946,12 @@ class AnsibleDebugState(DebugState):
         sf = self.stackframes[request.frame_id]
 
         # This is a very basic templating of the args and doesn't handle loops.
-        templar = Templar(loader=self._loader, variables=sf.task_vars)
-        task_args = templar.template(sf.task.args, fail_on_undefined=False)
+        # The result is kept on the frame and reused until a variable used by
+        # the args could have changed.
+        if sf.task_args is None:
+            templar = Templar(loader=self._loader, variables=sf.task_vars)
+            sf.task_args = templar.template(sf.task.args, fail_on_undefined=False)
+        task_args = sf.task_args
         module_opts = self._add_variable(
             sf,
             task_args,
@@ -604,28 +962,21 @@ class AnsibleDebugState(DebugState):
         sf.variables_options_id = module_opts.id
 
         task_vars = self._add_variable(sf, sf.task_vars)
+        task_vars.evaluate_name = ""
         sf.variables_taskvar_id = task_vars.id
 
-        # We use the hostvars but for simplicity sake we also overlay the task
-        # vars that might be set as these will contain things like play/task
-        # vars. The hostvars are a more persistent set of vars that last beyond
-        # this task so is important to give the user a way to set these
-        # persistently in the debugger.
-        host_vars_amalgamated = {k: v for k, v in sf.task_vars["hostvars"][sf.task_vars["inventory_hostname"]].items()}
-        for k, v in task_vars.get():
-            if k not in host_vars_amalgamated:
-                host_vars_amalgamated[k] = v
-
+        inventory_hostname = sf.task_vars["inventory_hostname"]
+        variable_manager = self._variable_manager
         host_vars = self._add_variable(
             sf,
-            host_vars_amalgamated,
-            var_factory=lambda i: AnsibleHostVarsVariable(
-                i, sf, host_vars_amalgamated, sf.task_vars["inventory_hostname"], self._variable_mamanger
-            ),
+            {},
+            var_factory=lambda i: AnsibleHostVarsVariable(i, sf, inventory_hostname, variable_manager),
         )
+        host_vars.evaluate_name = ""
         sf.variables_hostvars_id = host_vars.id
 
         global_vars = self._add_variable(sf, sf.task_vars["vars"])
+        global_vars.evaluate_name = "vars"
 
         scopes: list[ansibug.dap.Scope] = [
             # Options for the module itself
@@ -671,6 +1022,7 @@ class AnsibleDebugState(DebugState):
     ) -> ansibug.dap.EvaluateResponse:
         value = ""
         value_type = None
+        variable: AnsibleVariable | None = None
 
         # Known contexts and how they are used in VSCode
         # repl - Debug Console with the expression entered
@@ -697,7 +1049,7 @@ class AnsibleDebugState(DebugState):
 
             repl_command = parse_repl_args(expression[1:])
             if isinstance(repl_command, TemplateCommand):
-                value, value_type = self._safe_evaluate_expression(repl_command.expression, sf.task_vars)
+                value, value_type, variable = self._safe_evaluate_expression(repl_command.expression, sf)
 
             elif isinstance(repl_command, RemoveVarCommand):
                 ansible_var = self.variables[sf.variables_options_id]
@@ -713,6 +1065,7 @@ class AnsibleDebugState(DebugState):
                     # We want to have changing hostvars also apply to the task
                     # vars
                     var_ids += [sf.variables_taskvar_id, sf.variables_hostvars_id]
+                    sf.task_args = None
 
                 for vid in var_ids:
                     ansible_var = self.variables[vid]
@@ -722,9 +1075,13 @@ class AnsibleDebugState(DebugState):
                 # Error during parsing or --help was requested
                 value = str(repl_command)
 
-        elif request.context in ["repl", "watch", "clipboard", "variables"] and request.frame_id:
+        elif request.context in _EVAL_CONTEXTS and request.frame_id:
             sf = self.stackframes[request.frame_id]
-            value, value_type = self._safe_evaluate_expression(expression, sf.task_vars)
+            value, value_type, variable = self._safe_evaluate_expression(
+                expression,
+                sf,
+                display_only=request.context not in _COPY_CONTEXTS,
+            )
 
         else:
             value = f"Evaluation for {request.context} is not implemented"
@@ -733,6 +1090,9 @@ class AnsibleDebugState(DebugState):
             request_seq=request.seq,
             result=value,
             type=value_type,
+            variables_reference=variable.id if variable else 0,
+            named_variables=variable.named_variables if variable else None,
+            indexed_variables=variable.indexed_variables if variable else None,
         )
 
     def get_stacktrace(
@@ -741,7 +1101,9 @@ class AnsibleDebugState(DebugState):
     ) -> ansibug.dap.StackTraceResponse:
         stack_frames: list[ansibug.dap.StackFrame] = []
         thread = self.threads[request.thread_id]
-        for sfid in thread.stack_frames:
+        # The strategy thread may add or remove frames while this runs,
+        # iterating a deque that changes raises an error.
+        for sfid in tuple(thread.stack_frames):
             sf = self.stackframes[sfid]
             stack_frames.append(sf.to_dap())
 
@@ -766,17 +1128,50 @@ class AnsibleDebugState(DebugState):
     ) -> ansibug.dap.VariablesResponse:
         variable = self.variables[request.variables_reference]
 
+        # The client can page through large containers or request only the
+        # named/indexed children, only the requested range is processed.
+        children: collections.abc.Iterable[tuple[str, t.Any]]
+        if (request.filter == "indexed" and not variable.indexed_variables) or (
+            request.filter == "named" and not variable.named_variables
+        ):
+            children = []
+        else:
+            children = variable.get_slice(request.start or 0, request.count or 0)
+
         variables: list[ansibug.dap.Variable] = []
-        for name, value in variable.get():
+        for name, value in children:
             child_var: AnsibleVariable | None = None
-            if isinstance(value, (collections.abc.Mapping, collections.abc.Sequence)) and not isinstance(value, str):
-                child_var = self._add_variable(variable.stackframe, value)
+            evaluate_name = variable.child_evaluate_name(name)
+            if _is_container(value):
+                cached_child = variable.children.get(name, None)
+                if cached_child and cached_child[0] is value:
+                    child_var = cached_child[1]
+
+                elif cached_child and type(cached_child[1]) is _child_variable_type(value):
+                    # Some mappings, like hostvars, return a new view of the
+                    # same data on each access. The child is pointed to the
+                    # new value so the id and its own children are kept.
+                    child_var = cached_child[1]
+                    child_var._ds = value  # type: ignore[attr-defined]
+                    variable.children[name] = (value, child_var)
+
+                else:
+                    if cached_child:
+                        # The value has changed, the old child is no longer
+                        # reachable.
+                        self._remove_child_variable(cached_child[1])
+                    child_var = self._add_variable(variable.stackframe, value)
+                    child_var.evaluate_name = evaluate_name
+                    variable.children[name] = (value, child_var)
 
             variables.append(
                 ansibug.dap.Variable(
                     name=name,
-                    value=repr(value),
+                    # The client copies and edits the displayed value if it
+                    # cannot evaluate the variable so it must be in full.
+                    value=repr(value) if evaluate_name is None else _short_repr(value),
                     type=type(value).__name__,
+                    evaluate_name=evaluate_name,
                     named_variables=child_var.named_variables if child_var else 0,
                     indexed_variables=child_var.indexed_variables if child_var else 0,
                     variables_reference=child_var.id if child_var else 0,
@@ -796,16 +1191,23 @@ class AnsibleDebugState(DebugState):
 
         new_value = self._template(request.value, variable.stackframe.task_vars)
         variable.set(request.name, new_value)
+        if variable.id != variable.stackframe.variables_options_id:
+            # The templated task args may refer to the var that was changed.
+            variable.stackframe.task_args = None
+
+        if old_child := variable.children.pop(request.name, None):
+            self._remove_child_variable(old_child[1])
 
         new_container = None
-        if isinstance(new_value, (collections.abc.Mapping, collections.abc.Sequence)) and not isinstance(
-            new_value, str
-        ):
+        evaluate_name = variable.child_evaluate_name(request.name)
+        if _is_container(new_value):
             new_container = self._add_variable(variable.stackframe, new_value)
+            new_container.evaluate_name = evaluate_name
+            variable.children[request.name] = (new_value, new_container)
 
         return ansibug.dap.SetVariableResponse(
             request_seq=request.seq,
-            value=repr(new_value),
+            value=repr(new_value) if evaluate_name is None else _short_repr(new_value),
             type=type(new_value).__name__,
             variables_reference=new_container.id if new_container else 0,
             named_variables=new_container.named_variables if new_container else 0,
@@ -840,6 +1242,7 @@ class AnsibleDebugState(DebugState):
             id=tid,
             host=host,
         )
+        self._threads_by_host[host] = thread
         self._debugger.queue_msg(
             ansibug.dap.ThreadEvent(
                 reason="started",
@@ -860,17 +1263,40 @@ class AnsibleDebugState(DebugState):
         if var_factory:
             var = var_factory(var_id)
 
-        elif isinstance(value, collections.abc.Mapping):
-            var = AnsibleDictVariable(var_id, stackframe, value)
-
         else:
-            var = AnsibleListVariable(var_id, stackframe, value)
+            var = _child_variable_type(value)(var_id, stackframe, value)  # type: ignore[arg-type]
 
         self.variables[var_id] = var
-        stackframe.variables.append(var_id)
+        stackframe.variables.add(var_id)
 
         return var
 
+    def _remove_child_variable(
+        self,
+        variable: AnsibleVariable,
+    ) -> None:
+        """Removes a child variable and its descendants that were replaced."""
+        to_remove: set[int] = set()
+        pending = [variable]
+        while pending:
+            var = pending.pop()
+            to_remove.add(var.id)
+            pending.extend(c[1] for c in var.children.values())
+
+        variable.stackframe.variables -= to_remove
+        self._remove_variables(to_remove)
+
+    def _remove_variables(
+        self,
+        variable_ids: set[int],
+    ) -> None:
+        """Removes the variables with the ids specified."""
+        # The entries are removed in place as the server thread may add
+        # variables at the same time. The ids are copied as a frame's set can
+        # be changed by the server thread when a child variable is replaced.
+        for variable_id in tuple(variable_ids):
+            self.variables.pop(variable_id, None)
+
     def _resume_threads(
         self,
         thread_ids: collections.abc.Iterable[int],
@@ -885,34 +1311,72 @@ class AnsibleDebugState(DebugState):
     def _safe_evaluate_expression(
         self,
         expression: str,
-        task_vars: dict[t.Any, t.Any],
-    ) -> tuple[t.Any, str | None]:
-        """Evaluates an expression with a fallback on exception."""
+        stackframe: AnsibleStackFrame,
+        display_only: bool = True,
+    ) -> tuple[str, str | None, AnsibleVariable | None]:
+        """Evaluates an expression with a fallback on exception.
+
+        If display_only is set a container result is shortened like a
+        variable value and added as a variable the client can expand. Other
+        results, like a long string, have no other way to be viewed so are
+        always returned in full.
+        """
         value_type = None
+        variable = None
         try:
-            templated_value = self._template(expression, task_vars)
-        except AnsibleUndefinedVariable as e:
+            templated_value = self._template(expression, stackframe.task_vars)
+        except (AnsibleError, AttributeError, KeyError, TypeError) as e:
+            # Ansible errors, like a templating error, and the errors from a
+            # bad lookup in the expression already describe the problem so
+            # the traceback is only built for unexpected errors.
             value = f"{type(e).__name__}: {e!s}"
         except Exception as e:
             value = traceback.format_exc()
         else:
-            value = repr(templated_value)
             value_type = type(templated_value).__name__
+            if display_only:
+                value = _short_repr(templated_value)
+                if _is_container(templated_value):
+                    variable = self._add_variable(stackframe, templated_value)
+                    variable.evaluate_name = f"({expression})"
+            else:
+                value = repr(templated_value)
 
-        return value, value_type
+        return value, value_type, variable
 
     def _template(
         self,
         value: str,
         variables: dict[t.Any, t.Any],
     ) -> t.Any:
-        templar = Templar(loader=self._loader, variables=variables)
+        stripped_value = value.strip()
+
+        # A number or bool literal is the same in Jinja and Python so doesn't
+        # need to go through Jinja at all. Strings are not included as
+        # Ansible's native concat may convert a string result to another type.
+        try:
+            literal = ast.literal_eval(stripped_value)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            pass
+        else:
+            literal_type = type(literal)
+            if literal_type in _LITERAL_EVAL_TYPES or (
+                literal_type is float and _FLOAT_LITERAL_PATTERN.fullmatch(stripped_value)
+            ):
+                return literal
+
+        # The same applies to a bare variable name whose value templates to
+        # itself.
+        if stripped_value.isidentifier() and stripped_value not in _JINJA_LITERAL_NAMES and stripped_value in variables:
+            var_value = variables[stripped_value]
+            if type(var_value) in _LITERAL_TYPES:
+                return var_value
 
         # Always use native types even if the config has not been enabled as it
         # allows expressions like `1` to be returned as an int and keeps things
         # consistent.
-        if not C.DEFAULT_JINJA2_NATIVE:
-            templar = templar.copy_with_new_env(environment_class=AnsibleNativeEnvironment)
+        templar = self._native_templar
+        templar.available_variables = variables
 
         expression = "{{ %s }}" % value
 
@@ -995,8 +1459,9 @@ class StrategyModule(LinearStrategy):
         """Called when gathering the results of a queued task."""
         res = super()._process_pending_results(*args, **kwargs)
 
+        end_task = self._debug_state.end_task
         for task_res in res:
-            self._debug_state.end_task(task_res._host, task_res._task)
+            end_task(task_res._host, task_res._task)
 
         return res
 
@@ -443,51 +443,20 @@ def test_breakpoint_stepping(
     localhost_tid = thread_event.thread_id
 
     # Once running it'll run include_tasks which then validates the breakpoints
-    # This is a complicated step as the debuggee is building the source map
-    # based on the tasks found in order so it'll send multiple breakpoints
-    # update events.
-
-    # First task processed, both breakpoints are updated with the new lines
+    # The whole file is registered before the breakpoints are recalculated so
+    # each breakpoint receives a single update event with the final lines.
     bp_event1 = dap_client.wait_for_message(dap.BreakpointEvent)
     assert bp_event1.breakpoint.id == bp_resp.breakpoints[0].id
-    assert bp_event1.breakpoint.line == 2
-    assert bp_event1.breakpoint.end_line == 2
+    assert bp_event1.breakpoint.line == 5
+    assert bp_event1.breakpoint.end_line == 7
 
     bp_event2 = dap_client.wait_for_message(dap.BreakpointEvent)
     assert bp_event2.breakpoint.id == bp_resp.breakpoints[1].id
-    assert bp_event2.breakpoint.line == 2
-    assert bp_event2.breakpoint.end_line == 2
+    assert bp_event2.breakpoint.line == 8
+    assert bp_event2.breakpoint.end_line == 10
 
-    # Middle task is processed, both breakpoints are updated with the new lines
-    bp_event3 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event3.breakpoint.id == bp_resp.breakpoints[0].id
-    assert bp_event3.breakpoint.line == 5
-    assert bp_event3.breakpoint.end_line == 5
-
-    bp_event4 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event4.breakpoint.id == bp_resp.breakpoints[1].id
-    assert bp_event4.breakpoint.line == 5
-    assert bp_event4.breakpoint.end_line == 5
-
-    # Task 2 is processed, first breakpoint has the updated end_line,
-    # second breakpoint has new line updated for new task
-    bp_event5 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event5.breakpoint.id == bp_resp.breakpoints[0].id
-    assert bp_event5.breakpoint.line == 5
-    assert bp_event5.breakpoint.end_line == 7
-    bp_event6 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event6.breakpoint.id == bp_resp.breakpoints[1].id
-    assert bp_event6.breakpoint.line == 8
-    assert bp_event6.breakpoint.end_line == 8
-
-    # Task 3 is processed, last breakpoint has new end_line
-    bp_event7 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event7.breakpoint.id == bp_resp.breakpoints[1].id
-    assert bp_event7.breakpoint.line == 8
-    assert bp_event7.breakpoint.end_line == 10
-
-    bp_id1 = bp_event5.breakpoint.id
-    bp_id2 = bp_event7.breakpoint.id
+    bp_id1 = bp_event1.breakpoint.id
+    bp_id2 = bp_event2.breakpoint.id
 
     stopped_event = dap_client.wait_for_message(dap.StoppedEvent)
     assert stopped_event.reason == dap.StoppedReason.BREAKPOINT
@@ -902,128 +871,35 @@ def test_breakpoint_block_in_include(
     thread_event = dap_client.wait_for_message(dap.ThreadEvent)
     localhost_tid = thread_event.thread_id
 
-    # Tasks are processed one by one which will affect the breakpoints in the
-    # file and their locations.
-
-    # First task is processed, all breakpoints are set to this task
+    # The included file is registered as a whole so each breakpoint only
+    # receives the one event with the final location.
     bp_event1 = dap_client.wait_for_message(dap.BreakpointEvent)
     assert bp_event1.breakpoint.id == bp_id1
-    assert bp_event1.breakpoint.verified is True
-    assert bp_event1.breakpoint.message is None
-    assert bp_event1.breakpoint.line == 2
-    assert bp_event1.breakpoint.end_line == 2
+    assert bp_event1.breakpoint.verified is False
+    assert bp_event1.breakpoint.message == "Breakpoint cannot be set here."
+    assert bp_event1.breakpoint.line == 5
+    assert bp_event1.breakpoint.end_line == 5
 
     bp_event2 = dap_client.wait_for_message(dap.BreakpointEvent)
     assert bp_event2.breakpoint.id == bp_id2
-    assert bp_event2.breakpoint.verified is True
+    assert bp_event2.breakpoint.verified
     assert bp_event2.breakpoint.message is None
-    assert bp_event2.breakpoint.line == 2
-    assert bp_event2.breakpoint.end_line == 2
+    assert bp_event2.breakpoint.line == 6
+    assert bp_event2.breakpoint.end_line == 9
 
     bp_event3 = dap_client.wait_for_message(dap.BreakpointEvent)
     assert bp_event3.breakpoint.id == bp_id3
-    assert bp_event3.breakpoint.verified is True
+    assert bp_event3.breakpoint.verified
     assert bp_event3.breakpoint.message is None
-    assert bp_event3.breakpoint.line == 2
-    assert bp_event3.breakpoint.end_line == 2
+    assert bp_event3.breakpoint.line == 10
+    assert bp_event3.breakpoint.end_line == 13
 
     bp_event4 = dap_client.wait_for_message(dap.BreakpointEvent)
     assert bp_event4.breakpoint.id == bp_id4
-    assert bp_event4.breakpoint.verified is True
+    assert bp_event4.breakpoint.verified
     assert bp_event4.breakpoint.message is None
-    assert bp_event4.breakpoint.line == 2
-    assert bp_event4.breakpoint.end_line == 2
-
-    # block is processed, all are marked as invalid
-    bp_event5 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event5.breakpoint.id == bp_id1
-    assert bp_event5.breakpoint.verified is False
-    assert bp_event5.breakpoint.message == "Breakpoint cannot be set here."
-    assert bp_event5.breakpoint.line == 5
-    assert bp_event5.breakpoint.end_line == 5
-
-    bp_event6 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event6.breakpoint.id == bp_id2
-    assert bp_event6.breakpoint.verified is False
-    assert bp_event6.breakpoint.message == "Breakpoint cannot be set here."
-    assert bp_event6.breakpoint.line == 5
-    assert bp_event6.breakpoint.end_line == 5
-
-    bp_event7 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event7.breakpoint.id == bp_id3
-    assert bp_event7.breakpoint.verified is False
-    assert bp_event7.breakpoint.message == "Breakpoint cannot be set here."
-    assert bp_event7.breakpoint.line == 5
-    assert bp_event7.breakpoint.end_line == 5
-
-    bp_event8 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event8.breakpoint.id == bp_id4
-    assert bp_event8.breakpoint.verified is False
-    assert bp_event8.breakpoint.message == "Breakpoint cannot be set here."
-    assert bp_event8.breakpoint.line == 5
-    assert bp_event8.breakpoint.end_line == 5
-
-    # ping 1 is processed, bp1 is still invalid but remaining are updated to
-    # new location
-    bp_event9 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event9.breakpoint.id == bp_id2
-    assert bp_event9.breakpoint.verified
-    assert bp_event9.breakpoint.message is None
-    assert bp_event9.breakpoint.line == 6
-    assert bp_event9.breakpoint.end_line == 6
-
-    bp_event10 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event10.breakpoint.id == bp_id3
-    assert bp_event10.breakpoint.verified
-    assert bp_event10.breakpoint.message is None
-    assert bp_event10.breakpoint.line == 6
-    assert bp_event10.breakpoint.end_line == 6
-
-    bp_event11 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event11.breakpoint.id == bp_id4
-    assert bp_event11.breakpoint.verified
-    assert bp_event11.breakpoint.message is None
-    assert bp_event11.breakpoint.line == 6
-    assert bp_event11.breakpoint.end_line == 6
-
-    # rescue/ping 2 is processed, bp1 stays the same, bp2 has new lines, bp3+
-    # are set to the end lines.
-    bp_event12 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event12.breakpoint.id == bp_id2
-    assert bp_event12.breakpoint.verified
-    assert bp_event12.breakpoint.message is None
-    assert bp_event12.breakpoint.line == 6
-    assert bp_event12.breakpoint.end_line == 9
-
-    bp_event13 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event13.breakpoint.id == bp_id3
-    assert bp_event13.breakpoint.verified
-    assert bp_event13.breakpoint.message is None
-    assert bp_event13.breakpoint.line == 10
-    assert bp_event13.breakpoint.end_line == 10
-
-    bp_event14 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event14.breakpoint.id == bp_id4
-    assert bp_event14.breakpoint.verified
-    assert bp_event14.breakpoint.message is None
-    assert bp_event14.breakpoint.line == 10
-    assert bp_event14.breakpoint.end_line == 10
-
-    # always/ping 3 is processed, bp1/2 stays the same, bp3 has new end line,
-    # bp4 has updated line.
-    bp_event15 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event15.breakpoint.id == bp_id3
-    assert bp_event15.breakpoint.verified
-    assert bp_event15.breakpoint.message is None
-    assert bp_event15.breakpoint.line == 10
-    assert bp_event15.breakpoint.end_line == 13
-
-    bp_event16 = dap_client.wait_for_message(dap.BreakpointEvent)
-    assert bp_event16.breakpoint.id == bp_id4
-    assert bp_event16.breakpoint.verified
-    assert bp_event16.breakpoint.message is None
-    assert bp_event16.breakpoint.line == 14
-    assert bp_event16.breakpoint.end_line == 14
+    assert bp_event4.breakpoint.line == 14
+    assert bp_event4.breakpoint.end_line == 14
 
     stopped_event = dap_client.wait_for_message(dap.StoppedEvent)
     assert stopped_event.reason == dap.StoppedReason.BREAKPOINT
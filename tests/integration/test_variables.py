@@ -133,6 +133,14 @@ host2 ansible_host=127.0.0.1 ansible_connection=local ansible_python_interpreter
     )
     assert "host1" in [v.name for v in global_host_vars.variables]
     assert "host2" in [v.name for v in global_host_vars.variables]
+    host_ids = {v.name: v.variables_reference for v in global_host_vars.variables}
+
+    # Each hostvars lookup creates a new value but the ids should be reused.
+    global_host_vars = dap_client.send(
+        dap.VariablesRequest(variables_reference=hostvar_id),
+        dap.VariablesResponse,
+    )
+    assert {v.name: v.variables_reference for v in global_host_vars.variables} == host_ids
     dap_client.send(dap.ContinueRequest(thread_id=stopped_event.thread_id), dap.ContinueResponse)
 
     thread_event = dap_client.wait_for_message(dap.ThreadEvent)
@@ -784,6 +792,262 @@ def test_playbook_set_list_and_dict_value(
         raise Exception(f"Playbook failed {rc}\nSTDOUT: {play_out[0].decode()}\nSTDERR: {play_out[1].decode()}")
 
 
+def test_playbook_get_variables_paged(
+    dap_client: DAPClient,
+    tmp_path: pathlib.Path,
+) -> None:
+    playbook = tmp_path / "main.yml"
+    playbook.write_text(
+        r"""
+- hosts: localhost
+  gather_facts: false
+  vars:
+    my_list: [a, b, c, d, e]
+    my_dict:
+      key1: value1
+      key2: value2
+      key3: value3
+  tasks:
+  - debug:
+      msg: Placeholder
+"""
+    )
+
+    proc = dap_client.launch("main.yml", playbook_dir=tmp_path)
+
+    dap_client.send(
+        dap.SetBreakpointsRequest(
+            source=dap.Source(
+                name="main.yml",
+                path=str(playbook.absolute()),
+            ),
+            lines=[11],
+            breakpoints=[dap.SourceBreakpoint(line=11)],
+            source_modified=False,
+        ),
+        dap.SetBreakpointsResponse,
+    )
+
+    dap_client.send(dap.ConfigurationDoneRequest(), dap.ConfigurationDoneResponse)
+
+    thread_event = dap_client.wait_for_message(dap.ThreadEvent)
+    localhost_tid = thread_event.thread_id
+
+    dap_client.wait_for_message(dap.StoppedEvent)
+
+    st_resp = dap_client.send(dap.StackTraceRequest(thread_id=localhost_tid), dap.StackTraceResponse)
+    scope_resp = dap_client.send(dap.ScopesRequest(frame_id=st_resp.stack_frames[0].id), dap.ScopesResponse)
+
+    var_resp = dap_client.send(
+        dap.VariablesRequest(variables_reference=scope_resp.scopes[1].variables_reference),
+        dap.VariablesResponse,
+    )
+    list_var_id = None
+    dict_var_id = None
+    for v in var_resp.variables:
+        if v.name == "my_list":
+            list_var_id = v.variables_reference
+            assert v.indexed_variables == 5
+        elif v.name == "my_dict":
+            dict_var_id = v.variables_reference
+            assert v.named_variables == 3
+
+        if list_var_id is not None and dict_var_id is not None:
+            break
+    else:
+        raise Exception("Failed to find my_list and my_dict variable id")
+
+    # Requesting the same container again reuses the child variable ids.
+    var_resp = dap_client.send(
+        dap.VariablesRequest(variables_reference=scope_resp.scopes[1].variables_reference),
+        dap.VariablesResponse,
+    )
+    actual_ids = {v.name: v.variables_reference for v in var_resp.variables if v.name in ["my_list", "my_dict"]}
+    assert actual_ids == {"my_list": list_var_id, "my_dict": dict_var_id}
+
+    list_values = dap_client.send(
+        dap.VariablesRequest(variables_reference=list_var_id, filter="indexed", start=1, count=2),
+        dap.VariablesResponse,
+    )
+    assert [(v.name, v.value) for v in list_values.variables] == [("1", "'b'"), ("2", "'c'")]
+
+    list_values = dap_client.send(
+        dap.VariablesRequest(variables_reference=list_var_id, filter="indexed", start=3, count=10),
+        dap.VariablesResponse,
+    )
+    assert [(v.name, v.value) for v in list_values.variables] == [("3", "'d'"), ("4", "'e'")]
+
+    list_values = dap_client.send(
+        dap.VariablesRequest(variables_reference=list_var_id, filter="named"),
+        dap.VariablesResponse,
+    )
+    assert list_values.variables == []
+
+    dict_values = dap_client.send(
+        dap.VariablesRequest(variables_reference=dict_var_id, start=1, count=1),
+        dap.VariablesResponse,
+    )
+    assert [(v.name, v.value) for v in dict_values.variables] == [("key2", "'value2'")]
+
+    dict_values = dap_client.send(
+        dap.VariablesRequest(variables_reference=dict_var_id, filter="indexed"),
+        dap.VariablesResponse,
+    )
+    assert dict_values.variables == []
+
+    dap_client.send(dap.ContinueRequest(thread_id=localhost_tid), dap.ContinueResponse)
+    dap_client.wait_for_message(dap.ThreadEvent)
+    dap_client.wait_for_message(dap.TerminatedEvent)
+
+    play_out = proc.communicate()
+    if rc := proc.returncode:
+        raise Exception(f"Playbook failed {rc}\nSTDOUT: {play_out[0].decode()}\nSTDERR: {play_out[1].decode()}")
+
+
+def test_playbook_get_variables_large_value(
+    dap_client: DAPClient,
+    tmp_path: pathlib.Path,
+) -> None:
+    large_list = ", ".join(str(i) for i in range(150))
+    long_str = "a" * 300
+
+    playbook = tmp_path / "main.yml"
+    playbook.write_text(
+        rf"""
+- hosts: localhost
+  gather_facts: false
+  vars:
+    large_list: [{large_list}]
+    long_str: {long_str}
+    long_dict: {{value: {long_str}}}
+  tasks:
+  - debug:
+      msg: Placeholder
+"""
+    )
+
+    proc = dap_client.launch("main.yml", playbook_dir=tmp_path)
+
+    dap_client.send(
+        dap.SetBreakpointsRequest(
+            source=dap.Source(
+                name="main.yml",
+                path=str(playbook.absolute()),
+            ),
+            lines=[9],
+            breakpoints=[dap.SourceBreakpoint(line=9)],
+            source_modified=False,
+        ),
+        dap.SetBreakpointsResponse,
+    )
+
+    dap_client.send(dap.ConfigurationDoneRequest(), dap.ConfigurationDoneResponse)
+
+    thread_event = dap_client.wait_for_message(dap.ThreadEvent)
+    localhost_tid = thread_event.thread_id
+
+    dap_client.wait_for_message(dap.StoppedEvent)
+
+    st_resp = dap_client.send(dap.StackTraceRequest(thread_id=localhost_tid), dap.StackTraceResponse)
+    scope_resp = dap_client.send(dap.ScopesRequest(frame_id=st_resp.stack_frames[0].id), dap.ScopesResponse)
+
+    var_resp = dap_client.send(
+        dap.VariablesRequest(variables_reference=scope_resp.scopes[1].variables_reference),
+        dap.VariablesResponse,
+    )
+    found = 0
+    for v in var_resp.variables:
+        if v.name == "large_list":
+            found += 1
+            large_list_id = v.variables_reference
+            assert v.value == f"{v.type} (len=150)"
+            assert v.evaluate_name == "large_list"
+            assert v.indexed_variables == 150
+        elif v.name == "long_str":
+            found += 1
+            long_str_value = v.value
+            assert v.value == repr(long_str)
+            assert v.evaluate_name == "long_str"
+        elif v.name == "long_dict":
+            found += 1
+            long_dict_value = v.value
+            assert v.value == f"{{'value': '{long_str[:190]}'...}}"
+            assert v.evaluate_name == "long_dict"
+        elif v.name == "hostvars":
+            found += 1
+            assert v.value.startswith("{'localhost': {")
+            assert v.value.endswith("}")
+            assert "..." in v.value
+            assert len(v.value) < 300
+
+        if found == 4:
+            break
+    else:
+        raise Exception("Failed to find large_list, long_str, long_dict, and hostvars")
+
+    list_values = dap_client.send(
+        dap.VariablesRequest(variables_reference=large_list_id, start=149, count=1),
+        dap.VariablesResponse,
+    )
+    assert list_values.variables[0].evaluate_name == "large_list[149]"
+
+    # Copy Value evaluates the evaluate name to get the full value.
+    for evaluate_name, expected in [
+        ("large_list", repr(list(range(150)))),
+        ("long_str", repr(long_str)),
+        ("long_dict", repr({"value": long_str})),
+    ]:
+        eval_resp = dap_client.send(
+            dap.EvaluateRequest(
+                evaluate_name,
+                frame_id=st_resp.stack_frames[0].id,
+                context="clipboard",
+            ),
+            dap.EvaluateResponse,
+        )
+        assert eval_resp.result == expected
+
+    # Set Value starts from the displayed value, a string is shown in full so
+    # is unchanged while a shortened container fails to template.
+    set_resp = dap_client.send(
+        dap.SetVariableRequest(
+            variables_reference=scope_resp.scopes[1].variables_reference,
+            name="long_str",
+            value=long_str_value,
+        ),
+        dap.SetVariableResponse,
+    )
+    assert set_resp.value == repr(long_str)
+
+    err = dap_client.send(
+        dap.SetVariableRequest(
+            variables_reference=scope_resp.scopes[1].variables_reference,
+            name="long_dict",
+            value=long_dict_value,
+        ),
+        dap.ErrorResponse,
+    )
+    assert isinstance(err, dap.ErrorResponse)
+
+    eval_resp = dap_client.send(
+        dap.EvaluateRequest(
+            "long_dict",
+            frame_id=st_resp.stack_frames[0].id,
+            context="clipboard",
+        ),
+        dap.EvaluateResponse,
+    )
+    assert eval_resp.result == repr({"value": long_str})
+
+    dap_client.send(dap.ContinueRequest(thread_id=localhost_tid), dap.ContinueResponse)
+    dap_client.wait_for_message(dap.ThreadEvent)
+    dap_client.wait_for_message(dap.TerminatedEvent)
+
+    play_out = proc.communicate()
+    if rc := proc.returncode:
+        raise Exception(f"Playbook failed {rc}\nSTDOUT: {play_out[0].decode()}\nSTDERR: {play_out[1].decode()}")
+
+
 def test_playbook_eval(
     dap_client: DAPClient,
     tmp_path: pathlib.Path,
@@ -890,6 +1154,79 @@ def test_playbook_eval(
     assert eval_resp.result == "'bar'"
     assert eval_resp.type == "AnsibleUnicode"
 
+    eval_resp = dap_client.send(
+        dap.EvaluateRequest(
+            "range(150) | list",
+            frame_id=st_resp.stack_frames[0].id,
+            context="watch",
+        ),
+        dap.EvaluateResponse,
+    )
+    assert eval_resp.result == "list (len=150)"
+    assert eval_resp.type == "list"
+    assert eval_resp.variables_reference != 0
+    assert eval_resp.indexed_variables == 150
+
+    list_values = dap_client.send(
+        dap.VariablesRequest(variables_reference=eval_resp.variables_reference, start=149, count=1),
+        dap.VariablesResponse,
+    )
+    assert [(v.name, v.value) for v in list_values.variables] == [("149", "149")]
+
+    eval_resp = dap_client.send(
+        dap.EvaluateRequest(
+            "range(150) | list",
+            frame_id=st_resp.stack_frames[0].id,
+            context="clipboard",
+        ),
+        dap.EvaluateResponse,
+    )
+    assert eval_resp.result == repr(list(range(150)))
+    assert eval_resp.type == "list"
+    assert eval_resp.variables_reference == 0
+
+    for expression, expected_result, expected_type in [
+        ("1", "1", "int"),
+        ("-1.5", "-1.5", "float"),
+        ("1e3", "1000.0", "float"),
+        ("True", "True", "bool"),
+        ("None", "''", "str"),
+    ]:
+        eval_resp = dap_client.send(
+            dap.EvaluateRequest(
+                expression,
+                frame_id=st_resp.stack_frames[0].id,
+                context="repl",
+            ),
+            dap.EvaluateResponse,
+        )
+        assert eval_resp.result == expected_result
+        assert eval_resp.type == expected_type
+
+    # A string has no variable to expand so is not shortened in the console.
+    eval_resp = dap_client.send(
+        dap.EvaluateRequest(
+            "'a' * 300",
+            frame_id=st_resp.stack_frames[0].id,
+            context="repl",
+        ),
+        dap.EvaluateResponse,
+    )
+    assert eval_resp.result == repr("a" * 300)
+    assert eval_resp.type == "str"
+    assert eval_resp.variables_reference == 0
+
+    for expression in ["1.", ".5"]:
+        eval_resp = dap_client.send(
+            dap.EvaluateRequest(
+                expression,
+                frame_id=st_resp.stack_frames[0].id,
+                context="repl",
+            ),
+            dap.EvaluateResponse,
+        )
+        assert eval_resp.type is None
+
     eval_resp = dap_client.send(
         dap.EvaluateRequest(
             "invalid",
@@ -3,13 +3,24 @@
 
 from __future__ import annotations
 
+import queue
 import socket
+import threading
 
 import pytest
 
+import ansibug.dap as dap
 from ansibug import _mp_queue as mpq
 
 
+class QueueProtocol(mpq.MPProtocol):
+    def __init__(self) -> None:
+        self.received: queue.Queue[dap.ProtocolMessage] = queue.Queue()
+
+    def on_msg_received(self, msg: dap.ProtocolMessage) -> None:
+        self.received.put(msg)
+
+
 def test_connect_failure_unknown_target() -> None:
     with mpq.ClientMPQueue("tcp://unknown:12345", mpq.MPProtocol) as client:
         # The error message differs depending on the host, just check there
@@ -26,3 +37,28 @@ def test_connect_failure_refused() -> None:
     with mpq.ClientMPQueue(f"tcp://{addr[0]}:{addr[1]}", mpq.MPProtocol) as client:
         with pytest.raises(OSError, match="Connection refused"):
             client.start()
+
+
+def test_send_many() -> None:
+    server_proto = QueueProtocol()
+    with mpq.ServerMPQueue("uds://", lambda: server_proto) as server:
+        server_thread = threading.Thread(target=server.start)
+        server_thread.start()
+
+        with mpq.ClientMPQueue(server.address, mpq.MPProtocol) as client:
+            client.start()
+            server_thread.join()
+
+            client.send_many(
+                [
+                    dap.ThreadEvent(reason="exited", thread_id=2),
+                    dap.ThreadEvent(reason="exited", thread_id=3),
+                ]
+            )
+            client.send(dap.ThreadEvent(reason="exited", thread_id=4))
+
+            for expected_tid in [2, 3, 4]:
+                msg = server_proto.received.get(timeout=5)
+                assert isinstance(msg, dap.ThreadEvent)
+                assert msg.reason == "exited"
+                assert msg.thread_id == expected_tid